@@ -0,0 +1,124 @@
+"""
+Parser for the "Region" table of ESMF_Profile.summary files, shared by
+run-cam/timing.py and timing/timing.py.
+
+Rows are returned column-wise as a Summary: parallel NumPy arrays for the
+numeric columns plus the region names and a name -> row index map.
+"""
+
+from dataclasses import dataclass
+from typing import List, Dict, Optional
+
+import numpy as np
+
+# Trailing Region-table columns: Count, Mean, Min, Min PET, Max, Max PET;
+# optional PETs and PEs columns sit between the region name and Count
+_TAIL_COLS = 6
+
+def _is_fixed_point(tok: str) -> bool:
+    """True for tokens of the form digits.digits, e.g. '12.3456'."""
+    whole, dot, frac = tok.partition(".")
+    return bool(dot) and whole.isdecimal() and frac.isdecimal()
+
+def _split_row(line: str):
+    """Return (indent, name, PETs, PEs, tail) for a Region table line, else None.
+
+    PETs/PEs are None when the table has no such columns; tail holds the
+    Count/Mean/Min/Min PET/Max/Max PET tokens as strings.
+    """
+    parts = line.split()
+    if len(parts) <= _TAIL_COLS:
+        return None
+    tail = parts[-_TAIL_COLS:]
+    count, mean, mn, minpet, mx, maxpet = tail
+    if not ((count == "MULTIPLE" or count.isdecimal())
+            and _is_fixed_point(mean) and _is_fixed_point(mn) and _is_fixed_point(mx)
+            and minpet.isdecimal() and maxpet.isdecimal()):
+        return None
+    # Prefer the PETs/PEs reading whenever a name token is left over
+    pets = pes = None
+    ncols = _TAIL_COLS
+    if len(parts) > _TAIL_COLS + 2 and parts[-8].isdecimal() and parts[-7].isdecimal():
+        pets, pes = parts[-8], parts[-7]
+        ncols += 2
+    stripped = line.lstrip()
+    name = stripped.rsplit(None, ncols)[0]
+    return len(line) - len(stripped), name, pets, pes, tail
+
+@dataclass
+class Summary:
+    """Region table stored column-wise: entry i of every field describes row i.
+
+    Fields marked (full) are only filled in by parse_esmf_summary(..., full=True)
+    and are None otherwise.
+    """
+    names: List[str]
+    indent: np.ndarray                      # int32
+    mean: np.ndarray                        # float64, seconds
+    min: np.ndarray                         # float64, seconds
+    max: np.ndarray                         # float64, seconds
+    name_to_idx: Dict[str, int]             # last occurrence wins if duplicates
+    min_pet: Optional[np.ndarray] = None    # (full) int32
+    max_pet: Optional[np.ndarray] = None    # (full) int32
+    count: Optional[List[Optional[int]]] = None  # (full) None for MULTIPLE
+    pets: Optional[List[Optional[int]]] = None   # (full) None when the table has no PETs/PEs columns
+    pes: Optional[List[Optional[int]]] = None    # (full)
+    next_ge: Optional[np.ndarray] = None    # (full) int32, first later row with indent <= own (len if none)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+def _next_ge(indent: List[int]) -> np.ndarray:
+    """For each row, index of the first later row whose indent is <= its own (len(indent) if none)."""
+    n = len(indent)
+    out = np.empty(n, dtype=np.int32)
+    stack: List[int] = []
+    for i in range(n - 1, -1, -1):
+        while stack and indent[stack[-1]] > indent[i]:
+            stack.pop()
+        out[i] = stack[-1] if stack else n
+        stack.append(i)
+    return out
+
+def parse_esmf_summary(path: str, *, full: bool = False) -> Summary:
+    """Return the Region table of an ESMF_Profile.summary as a column-wise Summary.
+
+    With full=False only names, indent, mean/min/max and name_to_idx are
+    filled in; full=True adds the PET, count and PETs/PEs columns and next_ge.
+    An empty Summary is returned if the file has no Region rows.
+    """
+    # Mean/Min/Max (and Min PET/Max PET) tokens are kept as strings, row after
+    # row, and converted by NumPy in one call per column group below
+    names, indent, times = [], [], []
+    count, pets, pes, pet_ids = [], [], [], []
+    with open(path, errors="replace") as f:
+        for line in f:
+            row = _split_row(line)
+            if row is None:
+                continue
+            ind, name, row_pets, row_pes, tail = row
+            row_count, row_mean, row_min, row_minpet, row_max, row_maxpet = tail
+            names.append(name)
+            indent.append(ind)
+            times += (row_mean, row_min, row_max)
+            if full:
+                pets.append(int(row_pets) if row_pets else None)
+                pes.append(int(row_pes) if row_pes else None)
+                count.append(None if row_count == "MULTIPLE" else int(row_count))
+                pet_ids += (row_minpet, row_maxpet)
+    mean, mn, mx = np.array(times, dtype=np.float64).reshape(-1, 3).T.copy()
+    summary = Summary(
+        names=names,
+        indent=np.asarray(indent, dtype=np.int32),
+        mean=mean,
+        min=mn,
+        max=mx,
+        name_to_idx={name: i for i, name in enumerate(names)},
+    )
+    if full:
+        summary.min_pet, summary.max_pet = np.array(pet_ids, dtype=np.int32).reshape(-1, 2).T.copy()
+        summary.count = count
+        summary.pets = pets
+        summary.pes = pes
+        summary.next_ge = _next_ge(indent)
+    return summary
@@ -17,78 +17,47 @@ Examples
          --top 15 --csv compare.csv --png compare.png
 """
 
-import re
 import sys
 import csv
+import heapq
 import argparse
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+    from esmf_parse import Summary
 
 ANNOTATE_THRESHOLD_PCT = 5.0  # percent
 
-def parse_esmf_summary(path: str) -> List[Dict]:
-    """Return list of dict rows parsed from an ESMF_Profile.summary Region table."""
-    text = Path(path).read_text(errors="replace")
-    lines = text.splitlines()
-
-    # Pattern: optional PETs/PEs between name and Count
-    pat = re.compile(
-        r"^(?P<indent>\s*)(?P<name>\S.*?\S|\S)\s+"
-        r"(?:(?P<PETs>\d+)\s+(?P<PEs>\d+)\s+)?"
-        r"(?P<count>MULTIPLE|\d+)\s+"
-        r"(?P<mean>\d+\.\d+)\s+"
-        r"(?P<min>\d+\.\d+)\s+"
-        r"(?P<minpet>\d+)\s+"
-        r"(?P<max>\d+\.\d+)\s+"
-        r"(?P<maxpet>\d+)\s*$"
-    )
-
-    rows = []
-    for line in lines:
-        m = pat.match(line)
-        if not m:
-            continue
-        g = m.groupdict()
-        row = {
-            "indent": len(g["indent"] or ""),
-            "region": (g["name"] or "").strip(),
-            "PETs": int(g["PETs"]) if g.get("PETs") else None,
-            "PEs": int(g["PEs"]) if g.get("PEs") else None,
-            "Count": None if g["count"] == "MULTIPLE" else int(g["count"]),
-            "Mean (s)": float(g["mean"]),
-            "Min (s)": float(g["min"]),
-            "Min PET": int(g["minpet"]),
-            "Max (s)": float(g["max"]),
-            "Max PET": int(g["maxpet"]),
-        }
-        rows.append(row)
-    if not rows:
+def _parse(path: str) -> "Summary":
+    """parse_esmf_summary with every column, rejecting files without a Region table."""
+    from esmf_parse import parse_esmf_summary
+
+    summary = parse_esmf_summary(path, full=True)
+    if not len(summary):
         raise RuntimeError("No Region rows parsed. Is this an ESMF_Profile.summary file?")
-    return rows
-
-def find_region_rows(rows: List[Dict], region: str) -> Tuple[Optional[Dict], Optional[int]]:
-    """Return (parent_row, parent_index) for the given region name (exact match)."""
-    for i, r in enumerate(rows):
-        if r["region"] == region:
-            return r, i
-    return None, None
-
-def collect_children(rows: List[Dict], parent_idx: int) -> List[Dict]:
-    """Collect contiguous children with indent > parent_indent after parent_idx."""
-    parent_indent = rows[parent_idx]["indent"]
-    out = []
-    for j in range(parent_idx + 1, len(rows)):
-        if rows[j]["indent"] <= parent_indent:
-            break
-        out.append(rows[j])
-    return out
-
-def build_region_map(rows: List[Dict]) -> Dict[str, Dict]:
-    """Map region name to its row (last occurrence wins if duplicates)."""
-    m = {}
-    for r in rows:
-        m[r["region"]] = r
-    return m
+    return summary
+
+def find_region_rows(summary: "Summary", region: str) -> Optional[int]:
+    """Return the row index of the first row named region (exact match), or None."""
+    # names.index rather than name_to_idx: the parent is the first occurrence
+    try:
+        return summary.names.index(region)
+    except ValueError:
+        return None
+
+def collect_children(summary: "Summary", parent_idx: int) -> "np.ndarray":
+    """Return indices of the contiguous rows after parent_idx with indent > parent indent."""
+    import numpy as np
+
+    return np.arange(parent_idx + 1, summary.next_ge[parent_idx])
+
+def _error_bars(mean: "np.ndarray", mn: "np.ndarray", mx: "np.ndarray"):
+    """Return (mean - min, max - mean), clamped at 0, as whole-array ops."""
+    import numpy as np
+
+    return np.maximum(0.0, mean - mn), np.maximum(0.0, mx - mean)
 
 def main(argv=None):
     ap = argparse.ArgumentParser(description="Parse ESMF timing summary and report children of a region, with optional optimized overlay.")
@@ -100,37 +69,38 @@ def main(argv=None):
     ap.add_argument("--optimized-summary", default=None, help="Path to optimized ESMF_Profile.summary to overlay as a line")
     args = ap.parse_args(argv)
 
-    base_rows = parse_esmf_summary(args.summary)
+    # numpy and the shared parser (esmf_parse.py at the repository root) are
+    # only imported once the arguments are valid, keeping --help fast
+    import numpy as np
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+    base = _parse(args.summary)
 
     # choose region
     region = args.region
     if region is None:
-        region = "dyn_run" if any(r["region"] == "dyn_run" for r in base_rows) else base_rows[0]["region"]
+        region = "dyn_run" if "dyn_run" in base.name_to_idx else base.names[0]
 
-    parent, pidx = find_region_rows(base_rows, region)
-    if parent is None:
-        raise SystemExit(f"Region '{region}' not found in baseline.\nExamples: {', '.join(sorted(set(r['region'] for r in base_rows[:30])))}")
+    pidx = find_region_rows(base, region)
+    if pidx is None:
+        raise SystemExit(f"Region '{region}' not found in baseline.\nExamples: {', '.join(sorted(set(base.names[:30])))}")
 
-    base_children = collect_children(base_rows, pidx)
-    if not base_children:
+    base_children = collect_children(base, pidx)
+    if not base_children.size:
         print(f"No children found under region '{region}' in baseline.")
         return 0
 
-    pmean = parent["Mean (s)"]
-    for r in base_children:
-        r["% of parent (mean)"] = 100.0 * (r["Mean (s)"] / pmean) if pmean > 0 else float("nan")
+    pmean = base.mean[pidx]
 
-    # Sort baseline children by mean and truncate to top N
-    base_children_sorted = sorted(base_children, key=lambda r: r["Mean (s)"], reverse=True)[: args.top]
+    # Top N baseline children by mean, largest first
+    base_children_sorted = heapq.nlargest(args.top, base_children, key=lambda i: base.mean[i])
 
     # Prepare optimized overlay if provided: restrict to same child list & same order
-    opt_map = {}
+    opt = None
     if args.optimized_summary:
-        opt_rows = parse_esmf_summary(args.optimized_summary)
-        opt_parent, opt_pidx = find_region_rows(opt_rows, region)
-        if opt_parent is None:
+        opt = _parse(args.optimized_summary)
+        if find_region_rows(opt, region) is None:
             print(f"Warning: region '{region}' not found in optimized file; overlay will be empty.", file=sys.stderr)
-        opt_map = build_region_map(opt_rows)
 
     # Print table header
     print(f"Region: {region} (baseline parent mean = {pmean:.6f} s) — Top {args.top} children by mean time")
@@ -142,59 +112,41 @@ def main(argv=None):
         "" if not args.optimized_summary else " {:>14s} {:>12s} {:>12s} {:>16s}".format(header_cols[4], header_cols[5], header_cols[6], header_cols[7])
     ))
 
-    # Assemble CSV rows and plotting vectors
+    # Plotting vectors, aligned with the sorted children
+    top = np.asarray(base_children_sorted, dtype=np.intp)
+    labels = [base.names[i] for i in top]
+    base_means = base.mean[top]
+    base_xerr_low, base_xerr_high = _error_bars(base_means, base.min[top], base.max[top])
+    if opt is not None:
+        # row of each child in the optimized summary, -1 when missing
+        opt_idx = np.array([opt.name_to_idx.get(name, -1) for name in labels], dtype=np.intp)
+        opt_means = np.where(opt_idx >= 0, opt.mean[opt_idx], np.nan)  # NaN when missing
+        pct = np.divide(100.0 * (base_means - opt_means), base_means,
+                        out=np.full(top.size, np.nan), where=base_means > 0)
+
+    # Assemble CSV rows (tuples in fieldnames order)
     csv_rows = []
-    labels = []
-    base_means = []
-    base_xerr_low = []   # mean - min
-    base_xerr_high = []  # max - mean
-    opt_means = []       # will keep None when missing
-
-    for r in base_children_sorted:
-        name = r["region"]
-        base_mean = r["Mean (s)"]
-        base_min = r["Min (s)"]
-        base_max = r["Max (s)"]
-        labels.append(name)
-        base_means.append(base_mean)
-        base_xerr_low.append(max(0.0, base_mean - base_min))
-        base_xerr_high.append(max(0.0, base_max - base_mean))
-
-        row_out = {
-            "region": name,
-            "baseline_mean_s": base_mean,
-            "baseline_min_s": base_min,
-            "baseline_max_s": base_max,
-            "baseline_count": r.get("Count"),
-            "baseline_PETs": r.get("PETs"),
-            "baseline_PEs": r.get("PEs"),
-        }
-
-        if args.optimized_summary and name in opt_map:
-            o = opt_map[name]
-            opt_mean = o["Mean (s)"]
-            opt_min = o["Min (s)"]
-            opt_max = o["Max (s)"]
-            opt_means.append(opt_mean)
+    for k, i in enumerate(top):
+        name = labels[k]
+        base_mean = base_means[k]
+        base_min = base.min[i]
+        base_max = base.max[i]
+
+        row_out = (name, base_mean, base_min, base_max, base.count[i], base.pets[i], base.pes[i])
+
+        if opt is not None and opt_idx[k] >= 0:
+            o = opt_idx[k]
+            opt_mean = opt_means[k]
+            opt_min = opt.min[o]
+            opt_max = opt.max[o]
             speedup = (base_mean / opt_mean) if opt_mean and opt_mean > 0 else None
-            row_out.update({
-                "optimized_mean_s": opt_mean,
-                "optimized_min_s": opt_min,
-                "optimized_max_s": opt_max,
-                "optimized_count": o.get("Count"),
-                "optimized_PETs": o.get("PETs"),
-                "optimized_PEs": o.get("PEs"),
-                "speedup_base_over_opt": speedup,
-            })
-            print("{:40s} {:12.6f} {:12.6f} {:12.6f} {:14.6f} {:12.6f} {:12.6f} {:16.3f}".format(
-                name[:40], base_mean, base_min, base_max, opt_mean, opt_min, opt_max, speedup if speedup else float('nan')
-            ))
-        else:
-            opt_means.append(None if args.optimized_summary else 0.0)
-            if args.optimized_summary:
-                print("{:40s} {:12.6f} {:12.6f} {:12.6f} {:>14s} {:>12s} {:>12s} {:>16s}".format(
-                    name[:40], base_mean, base_min, base_max, "-", "-", "-", "-"
-                ))
+            row_out += (opt_mean, opt_min, opt_max, opt.count[o], opt.pets[o], opt.pes[o], speedup)
+            print(f"{name[:40]:40s} {base_mean:12.6f} {base_min:12.6f} {base_max:12.6f} "
+                  f"{opt_mean:14.6f} {opt_min:12.6f} {opt_max:12.6f} {speedup if speedup else float('nan'):16.3f}")
+        elif args.optimized_summary:
+            row_out += (None,) * 7
+            print(f"{name[:40]:40s} {base_mean:12.6f} {base_min:12.6f} {base_max:12.6f} "
+                  f"{'-':>14s} {'-':>12s} {'-':>12s} {'-':>16s}")
         csv_rows.append(row_out)
 
     # Write CSV if requested
@@ -207,28 +159,28 @@ def main(argv=None):
                            "optimized_count", "optimized_PETs", "optimized_PEs",
                            "speedup_base_over_opt"]
         with open(args.csv, "w", newline="") as f:
-            w = csv.DictWriter(f, fieldnames=fieldnames)
-            w.writeheader()
-            for row in csv_rows:
-                w.writerow(row)
+            w = csv.writer(f)
+            w.writerow(fieldnames)
+            w.writerows(csv_rows)
         print(f"Wrote CSV: {args.csv}")
 
     # Plot if requested
     if args.png:
         import matplotlib.pyplot as plt
 
-        # Horizontal bars for baseline mean; show min/max uncertainty as xerr
-        means_for_plot = list(reversed(base_means))
-        xerr_low = list(reversed(base_xerr_low))
-        xerr_high = list(reversed(base_xerr_high))
-        labs_for_plot = list(reversed(labels))
+        # Horizontal bars for baseline mean; show min/max uncertainty as xerr.
+        # Plot vectors are reversed views, so the largest child ends up on top.
+        means_for_plot = base_means[::-1]
+        xerr_low = base_xerr_low[::-1]
+        xerr_high = base_xerr_high[::-1]
+        labs_for_plot = labels[::-1]
 
         fig, ax = plt.subplots()
         ax.barh(labs_for_plot, means_for_plot, xerr=[xerr_low, xerr_high])
 
         # Overlay optimized means as a dark red line with filled circles
         if args.optimized_summary:
-            opt_vals_plot = [opt_means[labels.index(lbl)] if opt_means[labels.index(lbl)] is not None else float('nan') for lbl in labs_for_plot]
+            opt_vals_plot = opt_means[::-1]  # aligned with labels, NaN where missing
             ax.plot(opt_vals_plot, labs_for_plot, marker='o', linewidth=1.5, label="Optimized (mean)", color='darkred')
             ax.legend()
 
@@ -236,19 +188,11 @@ def main(argv=None):
             fig.canvas.draw()
             xmin, xmax = ax.get_xlim()
             xmax_annot = xmax * 0.995
-            for y_idx, lbl in enumerate(labs_for_plot):
-                base_val = means_for_plot[y_idx]
-                opt_val = opt_vals_plot[y_idx]
-                # skip missing/NaN
-                if isinstance(opt_val, float) and (opt_val != opt_val):  # NaN
-                    continue
-                if opt_val is None:
-                    continue
-                if base_val and base_val > 0:
-                    pct = (base_val - float(opt_val)) / base_val * 100.0
-                    if abs(pct) >= ANNOTATE_THRESHOLD_PCT:
-                        text = f"{abs(pct):.1f}% {'faster' if pct > 0 else 'slower'}"
-                        ax.text(xmax_annot, labs_for_plot[y_idx], text, va='center', ha='right')
+            # pct is NaN for missing optimized values, which never pass the threshold
+            annotate = np.abs(pct) >= ANNOTATE_THRESHOLD_PCT
+            for k in np.flatnonzero(annotate):
+                text = f"{abs(pct[k]):.1f}% {'faster' if pct[k] > 0 else 'slower'}"
+                ax.text(xmax_annot, labels[k], text, va='center', ha='right')
 
             # Expand x-limits slightly in case labels clip
             xmin2, xmax2 = ax.get_xlim()
@@ -1,43 +1,16 @@
 
 #!/usr/bin/env python3
-import re
 import sys
 import argparse
-import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.lines as mlines
 from pathlib import Path
+import numpy as np
 
-def parse_esmf_summary(path: str):
-    text = Path(path).read_text(errors="replace")
-    lines = text.splitlines()
-    pat = re.compile(
-        r"^(?P<indent>\s*)(?P<name>\S.*?\S|\S)\s+"
-        r"(?:(?P<PETs>\d+)\s+(?P<PEs>\d+)\s+)?"
-        r"(?P<count>MULTIPLE|\d+)\s+"
-        r"(?P<mean>\d+\.\d+)\s+"
-        r"(?P<min>\d+\.\d+)\s+"
-        r"(?P<minpet>\d+)\s+"
-        r"(?P<max>\d+\.\d+)\s+"
-        r"(?P<maxpet>\d+)\s*$"
-    )
-    rows = []
-    for line in lines:
-        m = pat.match(line)
-        if not m:
-            continue
-        g = m.groupdict()
-        rows.append({
-            "indent": len(g["indent"]),
-            "region": g["name"].strip(),
-            "Mean (s)": float(g["mean"]),
-            "Min (s)": float(g["min"]),
-            "Max (s)": float(g["max"]),
-        })
-    return rows
-
-def extract_named_regions(rows, names):
-    return [row for row in rows if row["region"] in names]
+# esmf_parse.py lives at the repository root, shared with run-cam/timing.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from esmf_parse import parse_esmf_summary
+
+def extract_named_regions(summary, names):
+    return np.array([summary.name_to_idx[n] for n in names], dtype=np.intp)
 
 def main():
     parser = argparse.ArgumentParser()
@@ -54,18 +27,21 @@ def main():
     parser.add_argument('--use-times', action='store_true', help='Show speedup as N× faster/slower instead of percentage')
     args = parser.parse_args()
 
-    base_rows = parse_esmf_summary(args.baseline)
-    opt_rows = parse_esmf_summary(args.optimized_summary) if args.optimized_summary else []
+    # matplotlib is only imported once the arguments are valid, keeping --help fast
+    import matplotlib.pyplot as plt
+    import matplotlib.lines as mlines
 
-    base_data = {r["region"]: r for r in extract_named_regions(base_rows, args.timers)}
-    opt_data = {r["region"]: r for r in extract_named_regions(opt_rows, args.timers)} if opt_rows else {}
+    base = parse_esmf_summary(args.baseline)
+    opt = parse_esmf_summary(args.optimized_summary) if args.optimized_summary else None
+    has_opt = opt is not None and any(r in opt.name_to_idx for r in args.timers)
 
     labels = args.timers_names_on_plot if args.timers_names_on_plot else args.timers
     y = np.arange(len(labels))
 
-    base_means = [base_data[r]["Mean (s)"] for r in args.timers]
-    base_lows = [base_data[r]["Mean (s)"] - base_data[r]["Min (s)"] for r in args.timers]
-    base_highs = [base_data[r]["Max (s)"] - base_data[r]["Mean (s)"] for r in args.timers]
+    base_idx = extract_named_regions(base, args.timers)
+    base_means = base.mean[base_idx]
+    base_lows = base_means - base.min[base_idx]
+    base_highs = base.max[base_idx] - base_means
 
     fig, ax = plt.subplots(figsize=(8, 4 + 0.4 * len(labels)))
 #    ax.barh(y, base_means, xerr=[base_lows, base_highs], align='center', capsize=8, color='#88c2f0', label=args.baseline_label)
@@ -88,42 +64,40 @@ def main():
     ax.errorbar(base_means, y_offset, fmt='o', color='#88c2f0', markersize=8.)
 
 #    ax.legend(handles=[minmax_legend, opt_legend])
-    if opt_data:
-        opt_means = [opt_data[r]["Mean (s)"] for r in args.timers]
-        opt_lows = [opt_data[r]["Mean (s)"] - opt_data[r]["Min (s)"] for r in args.timers]
-        opt_highs = [opt_data[r]["Max (s)"] - opt_data[r]["Mean (s)"] for r in args.timers]
+    if has_opt:
+        opt_idx = extract_named_regions(opt, args.timers)
+        opt_means = opt.mean[opt_idx]
+        opt_lows = opt_means - opt.min[opt_idx]
+        opt_highs = opt.max[opt_idx] - opt_means
 
         y_offset = y + dy
         ax.errorbar(opt_means, y_offset, xerr=[opt_lows, opt_highs], fmt='o', color='#8B0000', capsize=8, linewidth=2, label=args.legend_label)
 
-        for i, label in enumerate(labels):
-            base = base_means[i]
-            opt = opt_means[i]
-            if base > 0 and opt > 0:
-                pct = 100 * (base - opt) / base
-                if abs(pct) >= args.annotate_threshold:
-                    xpos = max(base, opt) #* 1.10
-                    xpos = opt-args.faster_label_offset
-#                    xlim = ax.get_xlim()
-#                    xpos = min(xpos, xlim[1] * 0.95)
-                    label_text = f"{abs(pct):.1f}% {'faster' if pct > 0 else 'slower'}"
-
-                    ax.text(
-                        xpos,
-                        y[i],
-                        label_text,
-                        va="center",
-                        fontsize=15,
-                        color="#8B0000"
-                    )
-                 #   ax.text(
-                 #       xpos,
-                 #       y[i],
-                 #       f"{pct:+.1f}% faster",
-                 #       va="center",
-                 #       fontsize=15,
-                 #       color="#8B0000"
-                 #   )
+        valid = (base_means > 0) & (opt_means > 0)
+        pct = np.divide(100 * (base_means - opt_means), base_means,
+                        out=np.zeros_like(base_means), where=valid)
+        for i in np.flatnonzero(valid & (np.abs(pct) >= args.annotate_threshold)):
+            xpos = opt_means[i] - args.faster_label_offset
+#            xlim = ax.get_xlim()
+#            xpos = min(xpos, xlim[1] * 0.95)
+            label_text = f"{abs(pct[i]):.1f}% {'faster' if pct[i] > 0 else 'slower'}"
+
+            ax.text(
+                xpos,
+                y[i],
+                label_text,
+                va="center",
+                fontsize=15,
+                color="#8B0000"
+            )
+         #   ax.text(
+         #       xpos,
+         #       y[i],
+         #       f"{pct[i]:+.1f}% faster",
+         #       va="center",
+         #       fontsize=15,
+         #       color="#8B0000"
+         #   )
 
     ax.set_yticks(y)
     ax.set_yticklabels(labels, fontsize=14)